@@ -5,10 +5,14 @@ Analyze current duplicate issues in the database
 
 import sqlite3
 import re
-from collections import defaultdict
 import hashlib
+from collections import defaultdict
 from pathlib import Path
 
+# Compiled once so the per-document loop skips re's cache lookup/flag parsing
+_WS_RE = re.compile(r'\s+')
+_PDF_EXT_RE = re.compile(r'\.pdf$', re.IGNORECASE)
+
 def analyze_duplicates():
     """Analyze current duplicate situation"""
     print("🔍 Analyzing current duplicate issues...")
@@ -27,45 +31,46 @@ def analyze_duplicates():
     print(f'📊 Total active documents: {len(docs)}')
     print()
 
-    # Group by original name (ignoring case and common variations)
+    doc_details = {d[0]: {
+        'id': d[0],
+        'original_name': d[1],
+        'filename': d[2],
+        'file_size': d[3],
+        'file_hash': d[4],
+        'upload_date': d[5],
+        'last_opened': d[6]
+    } for d in docs}
+
+    # Clean names in Python — SQLite's replace() strips ".pdf" anywhere
+    # in the name (not just a trailing extension) and can't express the
+    # case-insensitive suffix strip or the whitespace collapse, so a
+    # SQL key would group differently than this tool always has. The
+    # rows are already fetched above, so the single pass costs nothing
+    # extra.
     name_groups = defaultdict(list)
-    for doc in docs:
-        doc_id, original_name, filename, file_size, file_hash, upload_date, last_opened = doc
-        
-        # Clean the name for comparison
+    for d in docs:
+        original_name = d[1]
         if original_name:
-            clean_name = original_name.lower().strip()
-            # Remove common variations
-            clean_name = re.sub(r'\s+', ' ', clean_name)  # Normalize whitespace
-            clean_name = re.sub(r'\.pdf$', '', clean_name, flags=re.IGNORECASE)  # Remove .pdf extension
+            clean_name = _WS_RE.sub(' ', original_name.lower().strip())
+            clean_name = _PDF_EXT_RE.sub('', clean_name)
         else:
             clean_name = 'unknown'
-            
-        name_groups[clean_name].append({
-            'id': doc_id,
-            'original_name': original_name,
-            'filename': filename,
-            'file_size': file_size,
-            'file_hash': file_hash,
-            'upload_date': upload_date,
-            'last_opened': last_opened
-        })
-
-    # Find potential duplicates
-    duplicates = {name: docs for name, docs in name_groups.items() if len(docs) > 1}
+        name_groups[clean_name].append(doc_details[d[0]])
+
+    duplicates = {name: group for name, group in name_groups.items() if len(group) > 1}
 
     print(f'🔍 Found {len(duplicates)} groups with potential duplicates:')
     print()
 
     total_duplicates = 0
-    for name, docs in duplicates.items():
-        print(f'📄 "{name}" ({len(docs)} copies):')
-        for doc in docs:
+    for name, group in duplicates.items():
+        print(f'📄 "{name}" ({len(group)} copies):')
+        for doc in group:
             hash_display = doc['file_hash'][:8] + '...' if doc['file_hash'] else 'None'
             print(f'   - ID: {doc["id"][:8]}... | Size: {doc["file_size"]} bytes | Hash: {hash_display}')
             print(f'     Upload: {doc["upload_date"]} | Last Opened: {doc["last_opened"]}')
         print()
-        total_duplicates += len(docs) - 1  # Count extras (keep one)
+        total_duplicates += len(group) - 1  # Count extras (keep one)
 
     print(f'📊 Summary:')
     print(f'   - Total documents: {len(docs)}')
@@ -79,18 +84,25 @@ def analyze_duplicates():
         print(f'   Original: "{doc[1]}" -> Filename: "{doc[2]}"')
     print()
 
-    # Check for files with same hash
-    hash_groups = defaultdict(list)
-    for doc in docs:
-        if doc[4]:  # file_hash exists
-            hash_groups[doc[4]].append(doc)
-    
-    hash_duplicates = {h: docs for h, docs in hash_groups.items() if len(docs) > 1}
+    # Check for files with same hash — aggregated server-side via idx_file_hash
+    cursor.execute('''
+        SELECT file_hash, COUNT(*) AS copies, GROUP_CONCAT(id) AS ids
+        FROM documents
+        WHERE status != "deleted" AND file_hash IS NOT NULL
+        GROUP BY file_hash
+        HAVING copies > 1
+    ''')
+    hash_dup_rows = cursor.fetchall()
+
+    hash_duplicates = {}
+    for hash_val, copies, ids in hash_dup_rows:
+        hash_duplicates[hash_val] = [doc_details[doc_id] for doc_id in ids.split(',')]
+
     print(f'🔐 Found {len(hash_duplicates)} groups with identical file hashes:')
-    for hash_val, docs in hash_duplicates.items():
-        print(f'   Hash {hash_val[:8]}... ({len(docs)} files):')
-        for doc in docs:
-            print(f'     - {doc[1]} (ID: {doc[0][:8]}...)')
+    for hash_val, group in hash_duplicates.items():
+        print(f'   Hash {hash_val[:8]}... ({len(group)} files):')
+        for doc in group:
+            print(f'     - {doc["original_name"]} (ID: {doc["id"][:8]}...)')
     print()
 
     conn.close()
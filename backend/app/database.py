@@ -3,11 +3,13 @@ Database models and operations for PDF document management
 """
 
 import sqlite3
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, asdict
+from typing import Iterator, List, Optional, Dict, Any
+from dataclasses import dataclass
 import json
 
 @dataclass
@@ -34,15 +36,19 @@ class Document:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert document to dictionary for JSON serialization"""
-        data = asdict(self)
-        # Convert datetime objects to ISO strings
-        if self.upload_date:
+        # Direct attribute access instead of dataclasses.asdict, which
+        # deep-copies every field (the nested dicts/lists here are plain
+        # JSON data that the caller only reads)
+        data = {name: getattr(self, name) for name in self.__dataclass_fields__}
+        # Convert datetime objects to ISO strings (fields read with
+        # parse_dates=False are already ISO strings and pass through)
+        if isinstance(self.upload_date, datetime):
             data['upload_date'] = self.upload_date.isoformat()
-        if self.last_uploaded:
+        if isinstance(self.last_uploaded, datetime):
             data['last_uploaded'] = self.last_uploaded.isoformat()
-        if self.last_opened:
+        if isinstance(self.last_opened, datetime):
             data['last_opened'] = self.last_opened.isoformat()
-        if self.last_accessed:
+        if isinstance(self.last_accessed, datetime):
             data['last_accessed'] = self.last_accessed.isoformat()
         return data
 
@@ -78,11 +84,86 @@ class DocumentDatabase:
 
         print(f"📚 Database initialized at: {self.db_path}")
         print(f"📁 Docs directory at: {docs_dir}")
+
+        # One long-lived connection shared across calls; the lock serializes
+        # access so FastAPI worker threads don't interleave transactions
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
         self._init_database()
-    
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The shared long-lived connection (created on first use)"""
+        with self._lock:
+            if self._conn is None:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.execute("PRAGMA busy_timeout=5000")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA cache_size=-65536")       # 64 MiB page cache
+                conn.execute("PRAGMA mmap_size=268435456")     # 256 MiB memory-mapped I/O
+                conn.execute("PRAGMA temp_store=MEMORY")
+                self._conn = conn
+            return self._conn
+
+    @contextmanager
+    def _connect(self):
+        """Yield the cached connection under the lock, committing on success"""
+        with self._lock:
+            conn = self.conn
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def close(self):
+        """Close the cached connection (mainly for tests/shutdown)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _row_to_document(self, row: sqlite3.Row, parse_dates: bool = True) -> Document:
+        """Convert a database row into a Document (JSON + datetime hydration)
+
+        With parse_dates=False the stored ISO timestamp strings pass
+        through untouched — JSON-returning callers re-serialize to ISO
+        anyway, so the datetime round-trip is wasted work for them.
+        """
+        doc_data = dict(row)
+
+        # Parse JSON fields
+        if doc_data['validation_result']:
+            doc_data['validation_result'] = json.loads(doc_data['validation_result'])
+        if doc_data['metadata']:
+            doc_data['metadata'] = json.loads(doc_data['metadata'])
+        if doc_data['tags']:
+            doc_data['tags'] = json.loads(doc_data['tags'])
+
+        # Convert timestamp strings to datetime objects
+        if parse_dates:
+            doc_data['upload_date'] = datetime.fromisoformat(doc_data['upload_date'])
+            if doc_data['last_uploaded']:
+                doc_data['last_uploaded'] = datetime.fromisoformat(doc_data['last_uploaded'])
+            if doc_data['last_opened']:
+                doc_data['last_opened'] = datetime.fromisoformat(doc_data['last_opened'])
+            if doc_data['last_accessed']:
+                doc_data['last_accessed'] = datetime.fromisoformat(doc_data['last_accessed'])
+
+        # Remove extra fields not in Document model
+        doc_data.pop('created_at', None)
+        doc_data.pop('updated_at', None)
+
+        return Document(**doc_data)
+
     def _init_database(self):
         """Initialize database with proper schema and handle migrations"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            # WAL survives across connections; set it once here so later
+            # readers/writers stop fsyncing a rollback journal per write
+            conn.execute("PRAGMA journal_mode=WAL")
+
             # First create the basic table structure
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS documents (
@@ -149,6 +230,28 @@ class DocumentDatabase:
                 except Exception as e:
                     print(f"⚠️ Failed to create index {index_name}: {e}")
 
+            # Partial expression index matching the list-view ORDER BY so
+            # the planner walks the index instead of building a temp B-tree
+            try:
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_recency
+                    ON documents(COALESCE(last_opened, upload_date) DESC)
+                    WHERE status != 'deleted'
+                """)
+            except Exception as e:
+                print(f"⚠️ Failed to create index idx_recency: {e}")
+
+            # Expression indexes for the hot search_documents fields
+            search_indexes = [
+                ("idx_original_name_lower", "lower(original_name)"),
+                ("idx_filename_lower", "lower(filename)")
+            ]
+            for index_name, expression in search_indexes:
+                try:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON documents({expression})")
+                except Exception as e:
+                    print(f"⚠️ Failed to create index {index_name}: {e}")
+
             # Update existing documents to set last_uploaded = upload_date if null
             try:
                 if "last_uploaded" in current_columns:
@@ -162,6 +265,45 @@ class DocumentDatabase:
                 print(f"⚠️ Failed to update existing documents: {e}")
 
             conn.commit()
+
+            # Cache the column set and precompute the INSERT statement once,
+            # so per-insert calls skip the PRAGMA table_info round-trip
+            cursor = conn.execute("PRAGMA table_info(documents)")
+            self._columns = {row[1] for row in cursor.fetchall()}
+
+            insert_columns = [
+                'id', 'filename', 'original_name', 'upload_date', 'file_size', 'file_path',
+                'client_id', 'persona', 'job_role', 'validation_result', 'metadata'
+            ]
+            for optional in ('last_uploaded', 'last_opened', 'file_hash'):
+                if optional in self._columns:
+                    insert_columns.append(optional)
+
+            self._insert_columns = insert_columns
+            placeholders = ', '.join(['?'] * len(insert_columns))
+            self._insert_sql = (
+                f"INSERT INTO documents ({', '.join(insert_columns)}) VALUES ({placeholders})"
+            )
+
+    def _document_to_row(self, document: Document) -> List[Any]:
+        """Build the parameter list matching self._insert_sql"""
+        row = [
+            document.id,
+            document.filename,
+            document.original_name,
+            document.upload_date,
+            document.file_size,
+            document.file_path,
+            document.client_id,
+            document.persona,
+            document.job_role,
+            json.dumps(document.validation_result) if document.validation_result else None,
+            json.dumps(document.metadata) if document.metadata else None
+        ]
+        for optional in ('last_uploaded', 'last_opened', 'file_hash'):
+            if optional in self._columns:
+                row.append(getattr(document, optional))
+        return row
     
     def create_document(self,
                        filename: str,
@@ -194,109 +336,106 @@ class DocumentDatabase:
             file_hash=file_hash
         )
         
-        with sqlite3.connect(self.db_path) as conn:
-            # Check which columns exist
-            cursor = conn.execute("PRAGMA table_info(documents)")
-            existing_columns = {row[1] for row in cursor.fetchall()}
-
-            # Build dynamic insert query based on available columns
-            base_columns = [
-                'id', 'filename', 'original_name', 'upload_date', 'file_size', 'file_path',
-                'client_id', 'persona', 'job_role', 'validation_result', 'metadata'
-            ]
-            base_values = [
-                document.id,
-                document.filename,
-                document.original_name,
-                document.upload_date,
-                document.file_size,
-                document.file_path,
-                document.client_id,
-                document.persona,
-                document.job_role,
-                json.dumps(document.validation_result) if document.validation_result else None,
-                json.dumps(document.metadata) if document.metadata else None
-            ]
-
-            # Add new columns if they exist
-            if 'last_uploaded' in existing_columns:
-                base_columns.append('last_uploaded')
-                base_values.append(document.last_uploaded)
-            if 'last_opened' in existing_columns:
-                base_columns.append('last_opened')
-                base_values.append(document.last_opened)
-            if 'file_hash' in existing_columns:
-                base_columns.append('file_hash')
-                base_values.append(document.file_hash)
-
-            # Build and execute query
-            columns_str = ', '.join(base_columns)
-            placeholders = ', '.join(['?'] * len(base_values))
-            query = f"INSERT INTO documents ({columns_str}) VALUES ({placeholders})"
-
-            conn.execute(query, base_values)
+        with self._connect() as conn:
+            # Precomputed statement: columns were resolved once at init
+            conn.execute(self._insert_sql, self._document_to_row(document))
             conn.commit()
-        
+
         return document
     
-    def get_all_documents(self, limit: Optional[int] = None, offset: int = 0) -> List[Document]:
-        """Get all documents with optional pagination"""
-        with sqlite3.connect(self.db_path) as conn:
+    def create_documents_bulk(self, docs: List[Dict[str, Any]]) -> List[Document]:
+        """Create many document records in one transaction.
+
+        Each entry in `docs` takes the same keyword arguments as
+        `create_document`. All rows go through a single parameterized
+        INSERT via executemany, so only one fsync happens at COMMIT
+        instead of one per row.
+        """
+        if not docs:
+            return []
+
+        now = datetime.now()
+        documents = []
+        for spec in docs:
+            documents.append(Document(
+                id=str(uuid.uuid4()),
+                filename=spec['filename'],
+                original_name=spec['original_name'],
+                upload_date=now,
+                file_size=spec['file_size'],
+                file_path=spec['file_path'],
+                client_id=spec.get('client_id'),
+                persona=spec.get('persona'),
+                job_role=spec.get('job_role'),
+                validation_result=spec.get('validation_result'),
+                metadata=spec.get('metadata'),
+                last_uploaded=now,
+                last_opened=None,
+                file_hash=spec.get('file_hash')
+            ))
+
+        with self._lock:
+            conn = self.conn
+            rows = [self._document_to_row(document) for document in documents]
+
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(self._insert_sql, rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        return documents
+
+    def iter_all_documents(self, limit: Optional[int] = None, offset: int = 0,
+                           parse_dates: bool = True) -> Iterator[Document]:
+        """Stream hydrated Documents without buffering the full object list
+
+        The raw rows are fetched eagerly under the lock: yielding from
+        inside _connect() would suspend the generator while it still
+        holds the instance lock, deadlocking every other caller until
+        the consumer finishes (or abandons) the iterator. Hydration —
+        the expensive JSON/datetime parsing — stays lazy.
+        """
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
-            
+
             # Smart sorting: prioritize last_opened, fallback to upload_date
+            # (COALESCE form matches idx_recency so the index satisfies the sort)
             query = """
                 SELECT * FROM documents
                 WHERE status != 'deleted'
-                ORDER BY
-                    CASE
-                        WHEN last_opened IS NOT NULL THEN last_opened
-                        ELSE upload_date
-                    END DESC
+                ORDER BY COALESCE(last_opened, upload_date) DESC
             """
-            
+
+            # Placeholders keep the statement text stable across pages so
+            # SQLite's prepared-statement cache is reused
+            params = ()
             if limit:
-                query += f" LIMIT {limit} OFFSET {offset}"
-            
-            cursor = conn.execute(query)
-            rows = cursor.fetchall()
-            
-            documents = []
-            for row in rows:
-                doc_data = dict(row)
-                
-                # Parse JSON fields
-                if doc_data['validation_result']:
-                    doc_data['validation_result'] = json.loads(doc_data['validation_result'])
-                if doc_data['metadata']:
-                    doc_data['metadata'] = json.loads(doc_data['metadata'])
-                if doc_data['tags']:
-                    doc_data['tags'] = json.loads(doc_data['tags'])
-                
-                # Convert timestamp strings to datetime objects
-                doc_data['upload_date'] = datetime.fromisoformat(doc_data['upload_date'])
-                if doc_data['last_uploaded']:
-                    doc_data['last_uploaded'] = datetime.fromisoformat(doc_data['last_uploaded'])
-                if doc_data['last_opened']:
-                    doc_data['last_opened'] = datetime.fromisoformat(doc_data['last_opened'])
-                if doc_data['last_accessed']:
-                    doc_data['last_accessed'] = datetime.fromisoformat(doc_data['last_accessed'])
-                
-                # Remove extra fields not in Document model
-                doc_data.pop('created_at', None)
-                doc_data.pop('updated_at', None)
-                
-                documents.append(Document(**doc_data))
-            
-            return documents
-    
-    def get_document_by_id(self, document_id: str) -> Optional[Document]:
-        """Get a specific document by ID"""
-        documents = self.get_all_documents()
-        for doc in documents:
-            if doc.id == document_id:
-                return doc
-        return None
+                query += " LIMIT ? OFFSET ?"
+                params = (limit, offset)
+
+            rows = conn.execute(query, params).fetchall()
+
+        for row in rows:
+            yield self._row_to_document(row, parse_dates)
+
+    def get_all_documents(self, limit: Optional[int] = None, offset: int = 0,
+                          parse_dates: bool = True) -> List[Document]:
+        """Get all documents with optional pagination"""
+        return list(self.iter_all_documents(limit, offset, parse_dates))
+
+    def get_document_by_id(self, document_id: str, parse_dates: bool = True) -> Optional[Document]:
+        """Get a specific document by ID using the primary-key index"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute(
+                "SELECT * FROM documents WHERE id = ? AND status != 'deleted' LIMIT 1",
+                (document_id,)
+            )
+            row = cursor.fetchone()
+            return self._row_to_document(row, parse_dates) if row else None
 
     def get_document_metadata(self, document_id: str) -> List[Dict[str, Any]]:
         """Get metadata/sections for a document"""
@@ -319,34 +458,6 @@ class DocumentDatabase:
             })
         return metadata
 
-    def delete_document(self, document_id: str) -> bool:
-        """Delete a document and all its related data"""
-        try:
-            cursor = self.conn.cursor()
-
-            # Delete from document_sections first (foreign key constraint)
-            cursor.execute("DELETE FROM document_sections WHERE document_id = ?", (document_id,))
-
-            # Delete from documents table
-            cursor.execute("DELETE FROM documents WHERE id = ?", (document_id,))
-
-            # Check if document was actually deleted
-            deleted_count = cursor.rowcount
-
-            self.conn.commit()
-
-            if deleted_count > 0:
-                print(f"✅ Deleted document {document_id} and {cursor.rowcount} related sections")
-                return True
-            else:
-                print(f"⚠️ Document {document_id} not found in database")
-                return False
-
-        except Exception as e:
-            print(f"❌ Error deleting document {document_id}: {e}")
-            self.conn.rollback()
-            return False
-    
     def update_document(self, document_id: str, **updates) -> bool:
         """Update document fields"""
         if not updates:
@@ -367,7 +478,7 @@ class DocumentDatabase:
         set_clause = ", ".join([f"{key} = ?" for key in updates.keys()])
         values = list(updates.values()) + [document_id]
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute(
                 f"UPDATE documents SET {set_clause} WHERE id = ?",
                 values
@@ -377,7 +488,7 @@ class DocumentDatabase:
     
     def delete_document(self, document_id: str, soft_delete: bool = True) -> bool:
         """Delete a document (soft delete by default)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             if soft_delete:
                 cursor = conn.execute(
                     "UPDATE documents SET status = 'deleted', updated_at = ? WHERE id = ?",
@@ -391,40 +502,88 @@ class DocumentDatabase:
 
     def update_last_opened(self, document_id: str) -> bool:
         """Update the last_opened timestamp for a document"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            now = datetime.now()
             cursor = conn.execute(
                 "UPDATE documents SET last_opened = ?, updated_at = ? WHERE id = ?",
-                (datetime.now(), datetime.now(), document_id)
+                (now, now, document_id)
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def update_last_uploaded(self, document_id: str) -> bool:
+        """Update the last_uploaded timestamp for a document"""
+        with self._connect() as conn:
+            now = datetime.now()
+            cursor = conn.execute(
+                "UPDATE documents SET last_uploaded = ?, updated_at = ? WHERE id = ?",
+                (now, now, document_id)
             )
             conn.commit()
             return cursor.rowcount > 0
 
-    def get_documents_by_client(self, client_id: str) -> List[Document]:
-        """Get all documents for a specific client"""
-        documents = self.get_all_documents()
-        return [doc for doc in documents if doc.client_id == client_id]
+    def iter_documents_by_client(self, client_id: str, parse_dates: bool = True) -> Iterator[Document]:
+        """Stream a client's documents using idx_client_id
+
+        Rows are fetched under the lock, hydrated lazily outside it —
+        see iter_all_documents for why yielding under _connect() is
+        unsafe.
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT * FROM documents
+                WHERE client_id = ? AND status != 'deleted'
+                ORDER BY COALESCE(last_opened, upload_date) DESC
+            """, (client_id,)).fetchall()
+
+        for row in rows:
+            yield self._row_to_document(row, parse_dates)
+
+    def get_documents_by_client(self, client_id: str, parse_dates: bool = True) -> List[Document]:
+        """Get all documents for a specific client using idx_client_id"""
+        return list(self.iter_documents_by_client(client_id, parse_dates))
     
-    def search_documents(self, query: str, fields: List[str] = None) -> List[Document]:
-        """Search documents by text in specified fields"""
+    def iter_search_documents(self, query: str, fields: List[str] = None,
+                              parse_dates: bool = True) -> Iterator[Document]:
+        """Stream documents matching the search (filtered in SQL)"""
         if not fields:
             fields = ['original_name', 'filename', 'persona', 'job_role']
-        
-        documents = self.get_all_documents()
-        results = []
-        
-        query_lower = query.lower()
-        for doc in documents:
-            for field in fields:
-                field_value = getattr(doc, field, '')
-                if field_value and query_lower in field_value.lower():
-                    results.append(doc)
-                    break
-        
-        return results
+
+        # Only allow known text columns in the dynamically built WHERE clause
+        searchable_fields = {'original_name', 'filename', 'persona', 'job_role', 'status'}
+        fields = [f for f in fields if f in searchable_fields]
+        if not fields:
+            return
+
+        like_clause = " OR ".join([f"lower({field}) LIKE ? ESCAPE '\\'" for field in fields])
+        # Escape LIKE metacharacters so a literal % or _ in the query
+        # matches itself instead of acting as a wildcard — same
+        # semantics as the plain substring match this replaced
+        escaped = (query.lower().replace('\\', '\\\\')
+                   .replace('%', '\\%').replace('_', '\\_'))
+        pattern = f"%{escaped}%"
+
+        # Fetch under the lock, hydrate lazily outside it — see
+        # iter_all_documents for why yielding under _connect() is unsafe
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                f"SELECT * FROM documents WHERE status != 'deleted' AND ({like_clause})",
+                [pattern] * len(fields)
+            ).fetchall()
+
+        for row in rows:
+            yield self._row_to_document(row, parse_dates)
+
+    def search_documents(self, query: str, fields: List[str] = None,
+                         parse_dates: bool = True) -> List[Document]:
+        """Search documents by text in specified fields (filtered in SQL)"""
+        return list(self.iter_search_documents(query, fields, parse_dates))
     
     def get_document_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 SELECT
                     COUNT(*) as total_documents,
@@ -447,53 +606,19 @@ class DocumentDatabase:
 
     def find_duplicate_by_hash(self, file_hash: str) -> Optional[Document]:
         """Find document with matching hash"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(
                 "SELECT * FROM documents WHERE file_hash = ? AND status != 'deleted'",
                 (file_hash,)
             )
             row = cursor.fetchone()
-
-            if row:
-                doc_data = dict(row)
-
-                # Parse JSON fields
-                if doc_data['validation_result']:
-                    doc_data['validation_result'] = json.loads(doc_data['validation_result'])
-                if doc_data['metadata']:
-                    doc_data['metadata'] = json.loads(doc_data['metadata'])
-                if doc_data['tags']:
-                    doc_data['tags'] = json.loads(doc_data['tags'])
-
-                # Convert timestamp strings to datetime objects
-                doc_data['upload_date'] = datetime.fromisoformat(doc_data['upload_date'])
-                if doc_data['last_uploaded']:
-                    doc_data['last_uploaded'] = datetime.fromisoformat(doc_data['last_uploaded'])
-                if doc_data['last_opened']:
-                    doc_data['last_opened'] = datetime.fromisoformat(doc_data['last_opened'])
-                if doc_data['last_accessed']:
-                    doc_data['last_accessed'] = datetime.fromisoformat(doc_data['last_accessed'])
-
-                # Remove extra fields
-                doc_data.pop('created_at', None)
-                doc_data.pop('updated_at', None)
-
-                return Document(**doc_data)
-
-            return None
-
-    def update_last_uploaded(self, document_id: str) -> bool:
-        """Update last uploaded timestamp"""
-        return self.update_document(document_id, last_uploaded=datetime.now())
-
-    def update_last_opened(self, document_id: str) -> bool:
-        """Update last opened timestamp"""
-        return self.update_document(document_id, last_opened=datetime.now())
+            return self._row_to_document(row) if row else None
 
     def get_documents_sorted(self, sort_by: str = 'upload_date',
                            sort_order: str = 'desc',
-                           limit: Optional[int] = None) -> List[Document]:
+                           limit: Optional[int] = None,
+                           parse_dates: bool = True) -> List[Document]:
         """
         Get documents with sorting options
 
@@ -530,42 +655,17 @@ class DocumentDatabase:
             ORDER BY {order_clause}
         """
 
+        params = ()
         if limit:
-            query += f" LIMIT {limit}"
+            query += " LIMIT ?"
+            params = (limit,)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query)
+            cursor = conn.execute(query, params)
             rows = cursor.fetchall()
 
-            documents = []
-            for row in rows:
-                doc_data = dict(row)
-
-                # Parse JSON fields
-                if doc_data['validation_result']:
-                    doc_data['validation_result'] = json.loads(doc_data['validation_result'])
-                if doc_data['metadata']:
-                    doc_data['metadata'] = json.loads(doc_data['metadata'])
-                if doc_data['tags']:
-                    doc_data['tags'] = json.loads(doc_data['tags'])
-
-                # Convert timestamp strings to datetime objects
-                doc_data['upload_date'] = datetime.fromisoformat(doc_data['upload_date'])
-                if doc_data['last_uploaded']:
-                    doc_data['last_uploaded'] = datetime.fromisoformat(doc_data['last_uploaded'])
-                if doc_data['last_opened']:
-                    doc_data['last_opened'] = datetime.fromisoformat(doc_data['last_opened'])
-                if doc_data['last_accessed']:
-                    doc_data['last_accessed'] = datetime.fromisoformat(doc_data['last_accessed'])
-
-                # Remove extra fields
-                doc_data.pop('created_at', None)
-                doc_data.pop('updated_at', None)
-
-                documents.append(Document(**doc_data))
-
-            return documents
+            return [self._row_to_document(row, parse_dates) for row in rows]
 
 # Global database instance
 db = DocumentDatabase()
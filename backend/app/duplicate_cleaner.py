@@ -23,7 +23,10 @@ class DuplicatePDFCleaner:
         try:
             hash_sha256 = hashlib.sha256()
             with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
+                # 1 MiB chunks keep each update() inside OpenSSL's SHA-NI
+                # fast path instead of bouncing through the Python loop
+                # every 4 KiB
+                for chunk in iter(lambda: f.read(1 << 20), b""):
                     hash_sha256.update(chunk)
             return hash_sha256.hexdigest()
         except Exception as e:
@@ -7,14 +7,36 @@ Detects duplicates using multiple techniques: filename, content hash, PDF metada
 import hashlib
 import sqlite3
 import re
+import threading
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import PyPDF2
 import logging
 from datetime import datetime
 
+try:
+    import xxhash  # ~20 GB/s vs ~1 GB/s for SHA-256; dedup needs no crypto
+except ImportError:
+    xxhash = None
+
 logger = logging.getLogger(__name__)
 
+# Per-thread scratch state for hashing: one 1 MiB read buffer and one
+# template BLAKE2b context per worker, reused across every file. This
+# keeps the bulk-cleanup loop free of a buffer allocation per chunk
+# and an EVP context allocation per file; thread-locality makes it
+# safe under the threaded hashing executors.
+_HASH_TLS = threading.local()
+
+def _hash_scratch():
+    """Return (buffer, view, blake2b template) for the current thread"""
+    buf = getattr(_HASH_TLS, 'buf', None)
+    if buf is None:
+        buf = _HASH_TLS.buf = bytearray(1 << 20)
+        _HASH_TLS.view = memoryview(buf)
+        _HASH_TLS.blake2b = hashlib.blake2b(digest_size=8)
+    return buf, _HASH_TLS.view, _HASH_TLS.blake2b
+
 class PDFDuplicateDetector:
     """Advanced PDF duplicate detection using multiple techniques"""
     
@@ -23,17 +45,52 @@ class PDFDuplicateDetector:
         self.docs_dir = Path(docs_dir)
         
     def calculate_file_hash(self, file_path: Path) -> str:
-        """Calculate SHA-256 hash of file content"""
+        """Calculate a fast content hash for duplicate detection.
+
+        Duplicate detection needs no cryptographic property, so prefer
+        xxh3_64 (16 hex chars, keeps idx_file_hash small) and fall back
+        to BLAKE2b when xxhash isn't installed.
+        """
         try:
-            sha256_hash = hashlib.sha256()
+            buf, view, blake2b = _hash_scratch()
+            # copy() resets the template's state without reallocating
+            # the context; xxh3 construction is already allocation-light
+            hasher = xxhash.xxh3_64() if xxhash else blake2b.copy()
             with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(chunk)
-            return sha256_hash.hexdigest()
+                # readinto + memoryview: chunks land in the pooled
+                # buffer instead of a fresh bytes object per read
+                while (n := f.readinto(buf)):
+                    hasher.update(view[:n])
+            return hasher.hexdigest()
         except Exception as e:
             logger.error(f"Error calculating hash for {file_path}: {e}")
             return ""
     
+    def _probe_key(self, file_path: Path) -> Optional[Tuple]:
+        """Cheap inequality probe: (size, hash of first 64 KB, hash of last 64 KB).
+
+        Two files with different probe keys cannot be identical, so a
+        mismatch rejects a pair after reading at most 128 KB per file
+        instead of hashing both in full. Equal keys prove nothing —
+        callers must still compare full hashes.
+        """
+        try:
+            size = file_path.stat().st_size
+            with open(file_path, "rb") as f:
+                head = f.read(65536)
+                if size > 65536:
+                    f.seek(max(size - 65536, 65536))
+                    tail = f.read(65536)
+                else:
+                    tail = b""
+            def _digest(data):
+                return (xxhash.xxh3_64(data) if xxhash
+                        else hashlib.blake2b(data, digest_size=8)).hexdigest()
+            return (size, _digest(head), _digest(tail))
+        except Exception as e:
+            logger.error(f"Error probing {file_path}: {e}")
+            return None
+
     def extract_pdf_metadata(self, file_path: Path) -> Dict:
         """Extract PDF metadata for comparison"""
         try:
@@ -106,11 +163,16 @@ class PDFDuplicateDetector:
                 size1 = file1_path.stat().st_size
                 size2 = file2_path.stat().st_size
                 comparison['size_match'] = size1 == size2
-                
-                # File hash comparison (most reliable)
-                hash1 = self.calculate_file_hash(file1_path)
-                hash2 = self.calculate_file_hash(file2_path)
-                comparison['file_hash_match'] = hash1 == hash2 and hash1 != ""
+
+                # Probe key first: differing (size, head, tail) rules
+                # out identity from 128 KB per file; only matching
+                # probes pay for the full-content hash
+                probe1 = self._probe_key(file1_path)
+                probe2 = self._probe_key(file2_path)
+                if probe1 is not None and probe1 == probe2:
+                    hash1 = self.calculate_file_hash(file1_path)
+                    hash2 = self.calculate_file_hash(file2_path)
+                    comparison['file_hash_match'] = hash1 == hash2 and hash1 != ""
                 
                 # Filename similarity
                 name1 = self.normalize_filename(file1_path.name)
@@ -4,11 +4,17 @@ Create a working demo audio solution for hackathon
 """
 
 import os
+import shutil
 import wave
 import struct
 import math
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def create_working_demo():
     """Create working demo audio files in the correct locations"""
     
@@ -25,52 +31,74 @@ def create_working_demo():
     
     # Generate a pleasant tone sequence
     num_samples = int(sample_rate * duration)
-    audio_data = []
-    
-    for i in range(num_samples):
-        t = i / sample_rate
-        
-        # Create a pleasant chord progression
-        freq1 = 440  # A4
-        freq2 = 554.37  # C#5
-        freq3 = 659.25  # E5
-        
-        # Fade in/out
-        fade = min(t / 0.5, (duration - t) / 0.5, 1.0)
-        amplitude = 0.2 * fade
-        
-        # Mix three frequencies for a pleasant sound
-        sample = amplitude * (
-            0.5 * math.sin(2 * math.pi * freq1 * t) +
-            0.3 * math.sin(2 * math.pi * freq2 * t) +
-            0.2 * math.sin(2 * math.pi * freq3 * t)
+
+    # Create a pleasant chord progression
+    freq1 = 440  # A4
+    freq2 = 554.37  # C#5
+    freq3 = 659.25  # E5
+
+    if np is not None:
+        # Whole-array ufuncs replace num_samples Python-level math.sin calls
+        t = np.arange(num_samples, dtype=np.float32) / sample_rate
+        fade = np.minimum(np.minimum(t / 0.5, (duration - t) / 0.5), 1.0)  # Fade in/out
+        sample = 0.2 * fade * (
+            0.5 * np.sin(2 * np.pi * freq1 * t) +
+            0.3 * np.sin(2 * np.pi * freq2 * t) +
+            0.2 * np.sin(2 * np.pi * freq3 * t)
         )
-        
-        # Convert to 16-bit integer
-        sample_int = int(sample * 32767)
-        sample_int = max(-32768, min(32767, sample_int))  # Clamp
-        audio_data.append(sample_int)
-    
-    # Create WAV files in both locations
-    files_created = []
+        raw = np.clip(sample * 32767, -32768, 32767).astype('<i2').tobytes()
+    else:
+        # The fade envelope is piecewise-linear, so build it once as a
+        # ramp table instead of paying two divisions and a min() per sample
+        fade_in = int(0.5 * sample_rate)
+        fade = [1.0] * num_samples
+        for i in range(fade_in):
+            fade[i] = i / fade_in
+        for i in range(num_samples - fade_in, num_samples):
+            fade[i] = (num_samples - i) / fade_in
+
+        audio_data = []
+        for i in range(num_samples):
+            t = i / sample_rate
+            amplitude = 0.2 * fade[i]
+
+            # Mix three frequencies for a pleasant sound
+            sample = amplitude * (
+                0.5 * math.sin(2 * math.pi * freq1 * t) +
+                0.3 * math.sin(2 * math.pi * freq2 * t) +
+                0.2 * math.sin(2 * math.pi * freq3 * t)
+            )
+
+            # Convert to 16-bit integer
+            sample_int = int(sample * 32767)
+            sample_int = max(-32768, min(32767, sample_int))  # Clamp
+            audio_data.append(sample_int)
+
+        # Pack the whole buffer once instead of per-sample 2-byte writes
+        raw = struct.pack(f'<{len(audio_data)}h', *audio_data)
     
-    for directory, filename in [
-        (temp_audio_dir, "demo_podcast.wav"),
-        (temp_audio_dir, "demo_podcast.mp3"),  # Actually WAV but named MP3
-        (audio_dir, "demo_podcast.wav"),
-        (audio_dir, "demo_podcast.mp3")  # Actually WAV but named MP3
-    ]:
-        output_file = directory / filename
-        
-        with wave.open(str(output_file), 'w') as wav_file:
-            wav_file.setnchannels(1)  # Mono
-            wav_file.setsampwidth(2)  # 16-bit
-            wav_file.setframerate(sample_rate)
-            
-            # Write audio data
-            for sample in audio_data:
-                wav_file.writeframes(struct.pack('<h', sample))
-        
+    # Encode the WAV once, then copy it to the remaining locations
+    targets = [
+        temp_audio_dir / "demo_podcast.wav",
+        temp_audio_dir / "demo_podcast.mp3",  # Actually WAV but named MP3
+        audio_dir / "demo_podcast.wav",
+        audio_dir / "demo_podcast.mp3"  # Actually WAV but named MP3
+    ]
+
+    first_file = targets[0]
+    with wave.open(str(first_file), 'w') as wav_file:
+        wav_file.setnchannels(1)  # Mono
+        wav_file.setsampwidth(2)  # 16-bit
+        wav_file.setframerate(sample_rate)
+
+        # Write the same prepacked buffer in one call
+        wav_file.writeframes(raw)
+
+    files_created = [first_file]
+    print(f"✅ Created: {first_file} ({first_file.stat().st_size} bytes)")
+
+    for output_file in targets[1:]:
+        shutil.copy2(first_file, output_file)
         files_created.append(output_file)
         print(f"✅ Created: {output_file} ({output_file.stat().st_size} bytes)")
     
@@ -38,14 +38,47 @@ def find_all_pdf_files():
     ]
     
     all_pdfs = []
+    seen = set()
     for dir_path in possible_dirs:
         if os.path.exists(dir_path):
             pdf_dir = Path(dir_path)
-            pdfs = list(pdf_dir.glob("*.pdf"))
-            all_pdfs.extend([(pdf, pdf_dir) for pdf in pdfs])
-    
+            # scandir returns DirEntry objects with cached is_file/name,
+            # skipping the per-entry stat and Path churn of glob
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not entry.name.lower().endswith('.pdf'):
+                        continue
+                    pdf = Path(entry.path)
+                    # Overlapping/symlinked search dirs can surface the
+                    # same file twice; dedup on the resolved path
+                    resolved = pdf.resolve()
+                    if resolved in seen:
+                        continue
+                    seen.add(resolved)
+                    all_pdfs.append((pdf, pdf_dir))
+
     return all_pdfs
 
+# Columns copied from each source database, in INSERT order, with the
+# SQL default used when the column is NULL or missing from the source
+MERGE_COLUMNS = [
+    ("id", None),
+    ("filename", None),
+    ("original_name", "filename"),
+    ("upload_date", "strftime('%Y-%m-%dT%H:%M:%S', 'now')"),
+    ("file_size", "0"),
+    ("file_path", "''"),
+    ("status", "'uploaded'"),
+    ("client_id", None),
+    ("persona", None),
+    ("job_role", None),
+    ("processing_status", "'pending'"),
+    ("validation_result", None),
+    ("metadata", None),
+    ("last_accessed", None),
+    ("tags", None),
+]
+
 def consolidate_databases():
     """Consolidate all databases into one master database"""
     print("🔧 CONSOLIDATING DATABASES")
@@ -70,6 +103,14 @@ def consolidate_databases():
     # Create/recreate master database
     conn = sqlite3.connect(master_db_path)
     cursor = conn.cursor()
+
+    # Bulk-rebuild window: the repair is fully re-runnable, so trade
+    # durability for write speed and restore WAL/NORMAL in main()
+    cursor.execute("PRAGMA journal_mode=OFF")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA foreign_keys=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
     
     # Create table with comprehensive schema
     cursor.execute("""
@@ -98,6 +139,7 @@ def consolidate_databases():
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_upload_date ON documents(upload_date)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON documents(status)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_client_id ON documents(client_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_filename ON documents(filename)")
     
     all_documents = {}
     
@@ -107,91 +149,90 @@ def consolidate_databases():
             continue
             
         try:
-            source_conn = sqlite3.connect(db_path)
-            source_conn.row_factory = sqlite3.Row
+            # Read-only open skips journal/WAL setup on the source DBs
+            source_conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
             source_cursor = source_conn.cursor()
-            
-            # Check if documents table exists
-            source_cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='documents'")
-            if not source_cursor.fetchone():
+
+            # Check if documents table exists via the schema cache
+            source_cursor.execute("PRAGMA table_info(documents)")
+            available = {info[1] for info in source_cursor.fetchall()}
+            if not available:
                 print(f"⚠️ No documents table in {db_path}")
                 source_conn.close()
                 continue
-            
-            # Get all documents
-            source_cursor.execute("SELECT * FROM documents")
+
+            # Project only the columns the INSERT needs, with defaults
+            # applied in SQL, so each row is a ready-to-insert tuple
+            select_exprs = []
+            for column, default in MERGE_COLUMNS:
+                if column in available:
+                    select_exprs.append(f"COALESCE({column}, {default})" if default else column)
+                else:
+                    select_exprs.append(default or "NULL")
+            source_cursor.execute(f"SELECT {', '.join(select_exprs)} FROM documents")
             rows = source_cursor.fetchall()
-            
+
             print(f"📄 Found {len(rows)} documents in {db_path}")
-            
-            for row in rows:
-                doc_id = row['id']
+
+            for i, row in enumerate(rows):
+                doc_id = row[0]
                 if doc_id not in all_documents:
-                    all_documents[doc_id] = dict(row)
-                    print(f"  + {row.get('original_name', row.get('filename', 'Unknown'))}")
-            
+                    all_documents[doc_id] = row
+                    # Per-row prints flush and lock stdout; sample instead
+                    if i % 1000 == 0:
+                        print(f"  + {row[2] or row[1] or 'Unknown'}")
+
             source_conn.close()
             
         except Exception as e:
             print(f"❌ Error reading {db_path}: {e}")
     
-    # Insert all unique documents into master database
-    for doc_id, doc_data in all_documents.items():
-        try:
-            cursor.execute("""
-                INSERT OR REPLACE INTO documents (
-                    id, filename, original_name, upload_date, file_size, file_path,
-                    status, client_id, persona, job_role, processing_status,
-                    validation_result, metadata, last_accessed, tags
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                doc_data.get('id'),
-                doc_data.get('filename'),
-                doc_data.get('original_name', doc_data.get('filename')),
-                doc_data.get('upload_date', datetime.now().isoformat()),
-                doc_data.get('file_size', 0),
-                doc_data.get('file_path', ''),
-                doc_data.get('status', 'uploaded'),
-                doc_data.get('client_id'),
-                doc_data.get('persona'),
-                doc_data.get('job_role'),
-                doc_data.get('processing_status', 'pending'),
-                doc_data.get('validation_result'),
-                doc_data.get('metadata'),
-                doc_data.get('last_accessed'),
-                doc_data.get('tags')
-            ))
-        except Exception as e:
-            print(f"❌ Error inserting document {doc_id}: {e}")
+    # Insert all unique documents inside one transaction so the batch
+    # pays a single fsync at commit instead of one per row; executemany
+    # reuses a single prepared statement for every row
+    rows = list(all_documents.values())
+
+    try:
+        cursor.execute("BEGIN")
+        cursor.executemany("""
+            INSERT OR REPLACE INTO documents (
+                id, filename, original_name, upload_date, file_size, file_path,
+                status, client_id, persona, job_role, processing_status,
+                validation_result, metadata, last_accessed, tags
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+    except Exception as e:
+        print(f"❌ Error inserting documents: {e}")
     
     conn.commit()
-    
+
     # Get final count
     cursor.execute("SELECT COUNT(*) FROM documents")
     final_count = cursor.fetchone()[0]
-    
-    conn.close()
-    
+
     print(f"✅ Master database created with {final_count} documents at: {master_db_path}")
-    return master_db_path
+    # Hand the open connection to the later phases so they skip reopen
+    # (journal recovery + PRAGMA setup) on every step
+    return master_db_path, conn
 
-def scan_and_add_orphaned_pdfs():
+def scan_and_add_orphaned_pdfs(conn=None):
     """Find PDF files not in database and add them"""
     print("\n🔍 SCANNING FOR ORPHANED PDF FILES")
     print("=" * 50)
-    
-    # Get master database
-    master_db_path = Path("backend/data/documents.db")
-    if not master_db_path.exists():
-        print("❌ Master database not found")
-        return
-    
+
+    own_conn = conn is None
+    if own_conn:
+        master_db_path = Path("backend/data/documents.db")
+        if not master_db_path.exists():
+            print("❌ Master database not found")
+            return
+        conn = sqlite3.connect(master_db_path)
+
     # Get all PDFs
     all_pdfs = find_all_pdf_files()
     print(f"Found {len(all_pdfs)} PDF files total")
-    
+
     # Get existing filenames from database
-    conn = sqlite3.connect(master_db_path)
     cursor = conn.cursor()
     cursor.execute("SELECT filename FROM documents")
     existing_filenames = {row[0] for row in cursor.fetchall()}
@@ -203,14 +244,17 @@ def scan_and_add_orphaned_pdfs():
             orphaned_pdfs.append((pdf_path, pdf_dir))
     
     print(f"Found {len(orphaned_pdfs)} orphaned PDF files:")
-    
-    # Add orphaned PDFs to database
+
+    # Build all rows first, then insert them with one prepared statement
+    rows = []
     for pdf_path, pdf_dir in orphaned_pdfs:
         try:
-            # Extract original name (remove UUID prefix if present)
+            # Extract original name (remove UUID prefix if present);
+            # a positional check avoids splitting the whole filename
+            # into substrings just to measure the prefix
             filename = pdf_path.name
-            if '_' in filename and len(filename.split('_')[0]) == 36:  # UUID length
-                original_name = '_'.join(filename.split('_')[1:])
+            if len(filename) > 36 and filename[36] == '_':  # UUID length
+                original_name = filename[37:]
             else:
                 original_name = filename
             
@@ -219,14 +263,12 @@ def scan_and_add_orphaned_pdfs():
                 original_name = original_name[:-4]
             
             doc_id = str(uuid.uuid4())
-            file_size = pdf_path.stat().st_size
-            upload_date = datetime.fromtimestamp(pdf_path.stat().st_mtime)
+            # One stat syscall for both size and mtime
+            st = pdf_path.stat()
+            file_size = st.st_size
+            upload_date = datetime.fromtimestamp(st.st_mtime)
             
-            cursor.execute("""
-                INSERT INTO documents (
-                    id, filename, original_name, upload_date, file_size, file_path, status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+            rows.append((
                 doc_id,
                 filename,
                 original_name,
@@ -235,15 +277,21 @@ def scan_and_add_orphaned_pdfs():
                 str(pdf_path),
                 'uploaded'
             ))
-            
             print(f"  + Added: {original_name}")
             
         except Exception as e:
             print(f"  ❌ Failed to add {pdf_path.name}: {e}")
     
+    cursor.execute("BEGIN")
+    cursor.executemany("""
+        INSERT INTO documents (
+            id, filename, original_name, upload_date, file_size, file_path, status
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows)
     conn.commit()
-    conn.close()
-    
+    if own_conn:
+        conn.close()
+
     print(f"✅ Added {len(orphaned_pdfs)} orphaned PDFs to database")
 
 def consolidate_pdf_files():
@@ -279,53 +327,59 @@ def consolidate_pdf_files():
     
     print(f"✅ Moved {moved_count} PDF files to standard location")
 
-def update_file_paths_in_database():
+def update_file_paths_in_database(conn=None):
     """Update file paths in database to point to standard location"""
     print("\n🔧 UPDATING DATABASE FILE PATHS")
     print("=" * 50)
-    
-    master_db_path = Path("backend/data/documents.db")
+
     standard_docs_dir = Path("backend/data/docs")
-    
-    conn = sqlite3.connect(master_db_path)
+
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(Path("backend/data/documents.db"))
     cursor = conn.cursor()
     
     cursor.execute("SELECT id, filename, file_path FROM documents")
     documents = cursor.fetchall()
-    
-    updated_count = 0
+
+    updates = []
     for doc_id, filename, old_path in documents:
         new_path = standard_docs_dir / filename
         
         if str(new_path) != old_path:
-            cursor.execute("UPDATE documents SET file_path = ? WHERE id = ?", (str(new_path), doc_id))
-            updated_count += 1
+            updates.append((str(new_path), doc_id))
     
+    cursor.execute("BEGIN")
+    cursor.executemany("UPDATE documents SET file_path = ? WHERE id = ?", updates)
+    updated_count = len(updates)
     conn.commit()
-    conn.close()
-    
+    if own_conn:
+        conn.close()
+
     print(f"✅ Updated {updated_count} file paths in database")
 
 def main():
     """Run complete database repair"""
     print("🚀 COMPREHENSIVE DATABASE REPAIR")
     print("=" * 50)
-    
-    # Step 1: Consolidate databases
-    master_db = consolidate_databases()
-    
+
+    # Step 1: Consolidate databases (keeps its connection open so the
+    # later phases reuse it instead of reopening per step)
+    master_db, conn = consolidate_databases()
+
     # Step 2: Consolidate PDF files
     consolidate_pdf_files()
-    
+
     # Step 3: Scan for orphaned PDFs
-    scan_and_add_orphaned_pdfs()
-    
+    scan_and_add_orphaned_pdfs(conn)
+
     # Step 4: Update file paths
-    update_file_paths_in_database()
-    
-    # Step 5: Final verification
-    conn = sqlite3.connect(master_db)
+    update_file_paths_in_database(conn)
+
+    # Step 5: Restore durable settings and verify
     cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
     cursor.execute("SELECT COUNT(*) FROM documents WHERE status != 'deleted'")
     total_docs = cursor.fetchone()[0]
     conn.close()
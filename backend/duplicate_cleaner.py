@@ -6,20 +6,26 @@ Removes duplicate PDFs and properly sets upload/open times
 
 import sqlite3
 import hashlib
+import mmap
 import os
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import shutil
 
 def calculate_file_hash(file_path: Path) -> str:
     """Calculate SHA256 hash of file"""
-    hash_sha256 = hashlib.sha256()
     try:
         with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+            if hasattr(hashlib, 'file_digest'):
+                # C-implemented read loop (Python 3.11+)
+                return hashlib.file_digest(f, 'sha256').hexdigest()
+            # Fallback: hash the whole memory-mapped file in one update
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hash_sha256 = hashlib.sha256()
+                hash_sha256.update(mm)
+                return hash_sha256.hexdigest()
     except Exception as e:
         print(f"❌ Error calculating hash for {file_path}: {e}")
         return ""
@@ -37,17 +43,18 @@ def find_database():
             return path
     return None
 
-def analyze_duplicates():
+def analyze_duplicates(conn=None):
     """Analyze and identify duplicate documents"""
     print("🔍 ANALYZING DUPLICATES")
     print("=" * 50)
-    
-    db_path = find_database()
-    if not db_path:
-        print("❌ Database not found")
-        return
-    
-    conn = sqlite3.connect(db_path)
+
+    own_conn = conn is None
+    if own_conn:
+        db_path = find_database()
+        if not db_path:
+            print("❌ Database not found")
+            return
+        conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -62,20 +69,32 @@ def analyze_duplicates():
     documents = cursor.fetchall()
     print(f"📊 Total documents: {len(documents)}")
     
+    # Backfill missing hashes in parallel before grouping
+    doc_dicts = [dict(doc) for doc in documents]
+    missing = [d for d in doc_dicts if not d['file_hash'] and Path(d['file_path']).exists()]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(8, len(missing))) as executor:
+            hashes = executor.map(calculate_file_hash, [Path(d['file_path']) for d in missing])
+        updates = []
+        for d, file_hash in zip(missing, hashes):
+            d['file_hash'] = file_hash
+            # Unreadable files hash to "" — leave their rows NULL so a
+            # later pass can retry instead of persisting a junk value
+            if file_hash:
+                updates.append((file_hash, d['id']))
+        cursor.executemany("UPDATE documents SET file_hash = ? WHERE id = ?", updates)
+        # Close the backfill's transaction immediately: the connection
+        # is shared across phases, and clean_duplicates changes PRAGMA
+        # synchronous and issues BEGIN — both of which raise inside an
+        # open transaction
+        conn.commit()
+
     # Group by original name and calculate hashes
     groups = {}
     hash_groups = {}
     
-    for doc in documents:
-        doc_dict = dict(doc)
+    for doc_dict in doc_dicts:
         original_name = doc_dict['original_name']
-        file_path = Path(doc_dict['file_path'])
-        
-        # Calculate hash if missing
-        if not doc_dict['file_hash'] and file_path.exists():
-            file_hash = calculate_file_hash(file_path)
-            cursor.execute("UPDATE documents SET file_hash = ? WHERE id = ?", (file_hash, doc_dict['id']))
-            doc_dict['file_hash'] = file_hash
         
         # Group by original name
         if original_name not in groups:
@@ -87,9 +106,7 @@ def analyze_duplicates():
             if doc_dict['file_hash'] not in hash_groups:
                 hash_groups[doc_dict['file_hash']] = []
             hash_groups[doc_dict['file_hash']].append(doc_dict)
-    
-    conn.commit()
-    
+
     # Find duplicates
     name_duplicates = {name: docs for name, docs in groups.items() if len(docs) > 1}
     hash_duplicates = {hash_val: docs for hash_val, docs in hash_groups.items() if len(docs) > 1 and hash_val}
@@ -103,120 +120,147 @@ def analyze_duplicates():
         for doc in docs:
             file_exists = Path(doc['file_path']).exists()
             print(f"  - ID: {doc['id'][:8]}... | Hash: {doc['file_hash'][:8] if doc['file_hash'] else 'None'}... | File: {'✅' if file_exists else '❌'}")
-    
-    conn.close()
+
+    if own_conn:
+        conn.close()
     return name_duplicates, hash_duplicates
 
-def clean_duplicates():
+def clean_duplicates(conn=None):
     """Remove duplicate documents and consolidate data"""
     print("\n🧹 CLEANING DUPLICATES")
     print("=" * 50)
-    
-    db_path = find_database()
-    if not db_path:
-        print("❌ Database not found")
-        return
-    
-    conn = sqlite3.connect(db_path)
+
+    own_conn = conn is None
+    if own_conn:
+        db_path = find_database()
+        if not db_path:
+            print("❌ Database not found")
+            return
+        conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
-    
-    # Get all documents with hashes
+
+    # Bulk-cleanup window: re-runnable, so durability can be relaxed
+    # (main() restores WAL/NORMAL once the pipeline finishes)
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    
+    # Make sure the grouping below can use an index on file_hash
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_hash ON documents(file_hash)")
+
+    # Group duplicates in SQL — only hashes with more than one live row
+    # come back, instead of materializing every document in Python. The
+    # consolidated times come out of the same scan as MIN/MAX aggregates
+    # rather than Python loops over each group.
     cursor.execute("""
-        SELECT id, filename, original_name, file_path, file_hash, upload_date, last_uploaded, last_opened, file_size
-        FROM documents 
-        WHERE status != 'deleted'
-        ORDER BY file_hash, upload_date
+        SELECT file_hash, GROUP_CONCAT(id) AS ids, COUNT(*) AS copies,
+               MAX(COALESCE(last_uploaded, upload_date)) AS latest_upload,
+               MAX(last_opened) AS latest_opened
+        FROM documents
+        WHERE status != 'deleted' AND file_hash IS NOT NULL AND file_hash != ''
+        GROUP BY file_hash
+        HAVING copies > 1
     """)
-    
-    documents = cursor.fetchall()
-    
-    # Group by hash
-    hash_groups = {}
-    for doc in documents:
-        doc_dict = dict(doc)
-        file_hash = doc_dict['file_hash']
-        
-        if file_hash:
-            if file_hash not in hash_groups:
-                hash_groups[file_hash] = []
-            hash_groups[file_hash].append(doc_dict)
-    
+    duplicate_groups = cursor.fetchall()
+
     removed_count = 0
     consolidated_count = 0
-    
-    for file_hash, docs in hash_groups.items():
+
+    # One transaction for the whole cleanup burst — per-row autocommit
+    # would fsync the WAL for every UPDATE below
+    cursor.execute("BEGIN")
+    # Accumulate the row updates across all groups so each statement is
+    # prepared once and run via executemany after the loop
+    primary_updates = []
+    dup_ids = []
+    paths_to_delete = []
+
+    for group in duplicate_groups:
+        file_hash = group['file_hash']
+        ids = group['ids'].split(',')
+
+        placeholders = ','.join('?' * len(ids))
+        cursor.execute(f"""
+            SELECT id, filename, original_name, file_path, file_hash,
+                   upload_date, file_size
+            FROM documents
+            WHERE id IN ({placeholders})
+            ORDER BY upload_date
+        """, ids)
+        docs = [dict(row) for row in cursor.fetchall()]
+
         if len(docs) > 1:
             print(f"\n🔗 Processing {len(docs)} duplicates with hash {file_hash[:8]}...")
-            
-            # Sort by upload date (keep oldest as primary)
-            docs.sort(key=lambda x: x['upload_date'])
+
+            # Rows come back sorted by upload date (keep oldest as primary)
             primary_doc = docs[0]
             duplicates = docs[1:]
-            
+
             print(f"  📌 Keeping primary: {primary_doc['original_name']} (ID: {primary_doc['id'][:8]}...)")
-            
-            # Consolidate data from duplicates
-            earliest_upload = min(doc['upload_date'] for doc in docs)
-            latest_upload = max(doc['last_uploaded'] or doc['upload_date'] for doc in docs)
-            latest_opened = None
-            
-            # Find latest opened time
-            for doc in docs:
-                if doc['last_opened']:
-                    if not latest_opened or doc['last_opened'] > latest_opened:
-                        latest_opened = doc['last_opened']
-            
-            # Update primary document with consolidated times
-            cursor.execute("""
-                UPDATE documents 
-                SET last_uploaded = ?, last_opened = ?
-                WHERE id = ?
-            """, (latest_upload, latest_opened, primary_doc['id']))
-            
+
+            # Consolidated times were computed by the grouped query
+            latest_upload = group['latest_upload']
+            latest_opened = group['latest_opened']
+
+            # Queue the consolidated times for the primary document
+            primary_updates.append((latest_upload, latest_opened, primary_doc['id']))
+
             print(f"  ✅ Updated times - Upload: {latest_upload}, Opened: {latest_opened}")
             
             # Remove duplicate documents and files
             for dup_doc in duplicates:
-                # Delete file if it exists
-                file_path = Path(dup_doc['file_path'])
-                if file_path.exists():
-                    try:
-                        file_path.unlink()
-                        print(f"  🗑️ Deleted file: {file_path.name}")
-                    except Exception as e:
-                        print(f"  ⚠️ Failed to delete file {file_path.name}: {e}")
-                
-                # Mark as deleted in database
-                cursor.execute("""
-                    UPDATE documents 
-                    SET status = 'deleted'
-                    WHERE id = ?
-                """, (dup_doc['id'],))
-                
+                # Queue the file for deletion after the loop
+                paths_to_delete.append(dup_doc['file_path'])
+
+                # Queue the soft delete
+                dup_ids.append((dup_doc['id'],))
+
                 print(f"  🗑️ Marked as deleted: {dup_doc['original_name']} (ID: {dup_doc['id'][:8]}...)")
                 removed_count += 1
-            
+
             consolidated_count += 1
-    
+
+    cursor.executemany("""
+        UPDATE documents
+        SET last_uploaded = ?, last_opened = ?
+        WHERE id = ?
+    """, primary_updates)
+    cursor.executemany("UPDATE documents SET status = 'deleted' WHERE id = ?", dup_ids)
+
     conn.commit()
-    conn.close()
+
+    # unlink releases the GIL, so a thread pool overlaps the syscalls
+    def _delete_file(path):
+        try:
+            if os.path.exists(path):
+                os.unlink(path)
+                print(f"  🗑️ Deleted file: {os.path.basename(path)}")
+        except Exception as e:
+            print(f"  ⚠️ Failed to delete file {os.path.basename(path)}: {e}")
+
+    if paths_to_delete:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(_delete_file, paths_to_delete))
+    if own_conn:
+        conn.close()
     
     print(f"\n🎉 CLEANUP COMPLETE!")
     print(f"📊 Consolidated {consolidated_count} duplicate groups")
     print(f"🗑️ Removed {removed_count} duplicate documents")
 
-def update_missing_hashes():
+def update_missing_hashes(conn=None):
     """Calculate and update missing file hashes"""
     print("\n🔢 UPDATING MISSING HASHES")
     print("=" * 50)
-    
-    db_path = find_database()
-    if not db_path:
-        print("❌ Database not found")
-        return
-    
-    conn = sqlite3.connect(db_path)
+
+    own_conn = conn is None
+    if own_conn:
+        db_path = find_database()
+        if not db_path:
+            print("❌ Database not found")
+            return
+        conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # Find documents without hashes
@@ -229,36 +273,48 @@ def update_missing_hashes():
     documents = cursor.fetchall()
     print(f"📄 Documents missing hashes: {len(documents)}")
     
-    updated_count = 0
+    # Hash files in parallel — hashlib releases the GIL on large
+    # buffers, so threads scale across cores — then apply one batched
+    # UPDATE instead of a statement per row
+    to_hash = []
     for doc_id, file_path, filename in documents:
         path = Path(file_path)
         if path.exists():
-            file_hash = calculate_file_hash(path)
+            to_hash.append((doc_id, filename, path))
+        else:
+            print(f"  ⚠️ File not found: {filename}")
+
+    updates = []
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=min(8, len(to_hash))) as executor:
+            hashes = executor.map(calculate_file_hash, [p for _, _, p in to_hash])
+        for (doc_id, filename, _), file_hash in zip(to_hash, hashes):
             if file_hash:
-                cursor.execute("UPDATE documents SET file_hash = ? WHERE id = ?", (file_hash, doc_id))
+                updates.append((file_hash, doc_id))
                 print(f"  ✅ Updated hash for: {filename}")
-                updated_count += 1
             else:
                 print(f"  ❌ Failed to calculate hash for: {filename}")
-        else:
-            print(f"  ⚠️ File not found: {filename}")
-    
+
+    cursor.executemany("UPDATE documents SET file_hash = ? WHERE id = ?", updates)
+    updated_count = len(updates)
     conn.commit()
-    conn.close()
-    
+    if own_conn:
+        conn.close()
+
     print(f"✅ Updated {updated_count} file hashes")
 
-def update_time_tracking():
+def update_time_tracking(conn=None):
     """Update missing time tracking fields"""
     print("\n⏰ UPDATING TIME TRACKING")
     print("=" * 50)
-    
-    db_path = find_database()
-    if not db_path:
-        print("❌ Database not found")
-        return
-    
-    conn = sqlite3.connect(db_path)
+
+    own_conn = conn is None
+    if own_conn:
+        db_path = find_database()
+        if not db_path:
+            print("❌ Database not found")
+            return
+        conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # Update last_uploaded for documents where it's null
@@ -270,47 +326,58 @@ def update_time_tracking():
     
     updated_uploaded = cursor.rowcount
     print(f"✅ Updated last_uploaded for {updated_uploaded} documents")
-    
+
     conn.commit()
-    conn.close()
+    if own_conn:
+        conn.close()
 
 def main():
     """Run complete duplicate cleaning and time tracking update"""
     print("🚀 COMPREHENSIVE DUPLICATE CLEANER")
     print("=" * 50)
-    
+
+    db_path = find_database()
+    if not db_path:
+        print("❌ Database not found")
+        return
+
+    # One connection for the whole pipeline — each reopen would pay WAL
+    # recovery plus PRAGMA setup again. Every phase commits its own work.
+    conn = sqlite3.connect(db_path)
+
     # Step 1: Update missing hashes
-    update_missing_hashes()
-    
+    update_missing_hashes(conn)
+
     # Step 2: Analyze duplicates
-    name_duplicates, hash_duplicates = analyze_duplicates()
-    
+    name_duplicates, hash_duplicates = analyze_duplicates(conn)
+
     # Step 3: Clean duplicates
     if hash_duplicates:
-        clean_duplicates()
+        clean_duplicates(conn)
     else:
         print("✅ No hash-based duplicates found")
-    
+
     # Step 4: Update time tracking
-    update_time_tracking()
-    
+    update_time_tracking(conn)
+
     # Step 5: Final verification
-    db_path = find_database()
-    if db_path:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM documents WHERE status != 'deleted'")
-        final_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM documents WHERE file_hash IS NOT NULL AND status != 'deleted'")
-        hashed_count = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        print(f"\n📊 FINAL STATUS:")
-        print(f"📄 Active documents: {final_count}")
-        print(f"🔗 Documents with hashes: {hashed_count}")
+    cursor = conn.cursor()
+
+    # Restore durable settings after the bulk phases
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+
+    cursor.execute("SELECT COUNT(*) FROM documents WHERE status != 'deleted'")
+    final_count = cursor.fetchone()[0]
+
+    cursor.execute("SELECT COUNT(*) FROM documents WHERE file_hash IS NOT NULL AND status != 'deleted'")
+    hashed_count = cursor.fetchone()[0]
+
+    conn.close()
+
+    print(f"\n📊 FINAL STATUS:")
+    print(f"📄 Active documents: {final_count}")
+    print(f"🔗 Documents with hashes: {hashed_count}")
 
 if __name__ == "__main__":
     main()
@@ -5,11 +5,21 @@ Emergency API endpoint to ensure documents are always accessible
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import asyncio
+import atexit
+import functools
+import logging
+import os
 import sqlite3
 import json
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 
+logger = logging.getLogger("emergency_api")
+
 app = FastAPI(title="Emergency Document API")
 
 # Add CORS
@@ -21,23 +31,155 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def find_database():
-    """Find the database file in any possible location"""
+def _open_tuned(db_path, readonly=False, check_same_thread=True):
+    """Open a SQLite connection with PRAGMAs tuned for frequent access"""
+    if readonly:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True,
+                               check_same_thread=check_same_thread)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+    cursor = conn.cursor()
+    if not readonly:
+        # Changing the journal mode writes the header, so only attempt
+        # it on writable connections
+        cursor.execute("PRAGMA journal_mode=WAL")   # non-blocking readers
+    cursor.execute("PRAGMA synchronous=NORMAL")     # fsync on checkpoint, not per-commit
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-20000")      # ~20 MB page cache
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+# One connection reused across requests keeps SQLite's per-connection
+# page cache hot (B-tree root pages stay resident). The endpoints only
+# read, so WAL readers never block a writer. Keyed on the resolved
+# path: find_database's TTL cache exists because the location can
+# change, so a moved database must not keep serving through the old
+# connection.
+_CONN = None
+_CONN_PATH = None
+_CONN_LOCK = threading.Lock()
+
+def _get_connection(db_path):
+    """Return the shared tuned connection for db_path, reopening on change"""
+    global _CONN, _CONN_PATH
+    path = str(db_path)
+    with _CONN_LOCK:
+        if _CONN is None or _CONN_PATH != path:
+            if _CONN is not None:
+                _CONN.close()
+            _CONN = _open_tuned(path, check_same_thread=False)
+            _CONN_PATH = path
+            atexit.register(_CONN.close)
+        return _CONN
+
+@functools.lru_cache(maxsize=1)
+def _find_database_cached(ttl_bucket):
+    """Probe the candidate paths; cached per 30-second TTL bucket"""
     possible_paths = [
         "backend/data/documents.db",
-        "data/documents.db", 
+        "data/documents.db",
         "backend/app/data/documents.db",
         "app/data/documents.db",
         "documents.db"
     ]
-    
+
+    # One scandir per parent directory replaces a stat per candidate
+    # and rules out every candidate under a missing parent at once
+    entries_by_parent = {}
     for path in possible_paths:
-        if Path(path).exists():
+        parent, name = os.path.split(path)
+        parent = parent or "."
+        if parent not in entries_by_parent:
+            try:
+                with os.scandir(parent) as it:
+                    entries_by_parent[parent] = {entry.name for entry in it}
+            except OSError:
+                entries_by_parent[parent] = set()
+        if name in entries_by_parent[parent]:
             return Path(path)
-    
+
     return None
 
-@app.get("/emergency/documents")
+def find_database():
+    """Find the database file in any possible location"""
+    # The location essentially never changes, so skip the stat storm on
+    # every request; the bucket rotates every 30s to self-invalidate
+    return _find_database_cached(int(time.time()) // 30)
+
+@functools.lru_cache(maxsize=1)
+def _find_pdf_files_cached(ttl_bucket):
+    """Glob the candidate PDF directories; cached per TTL bucket"""
+    pdf_dirs = [
+        "backend/data/docs",
+        "data/docs",
+        "backend/app/data/docs"
+    ]
+
+    pdf_files = []
+    for pdf_dir in pdf_dirs:
+        if Path(pdf_dir).exists():
+            pdf_files.extend(Path(pdf_dir).glob("*.pdf"))
+    return pdf_dirs, pdf_files
+
+@app.on_event("startup")
+async def _clear_path_caches():
+    _find_database_cached.cache_clear()
+    _find_pdf_files_cached.cache_clear()
+
+def _fetch_documents_sync(db_path):
+    """Blocking document fetch, run off the event loop via to_thread"""
+    conn = _get_connection(db_path)
+    cursor = conn.cursor()
+
+    # Check if table exists
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='documents'")
+    if not cursor.fetchone():
+        return {
+            "documents": [],
+            "count": 0,
+            "error": "Documents table not found",
+            "database_path": str(db_path)
+        }
+
+    # Project only the fields the response uses — SELECT * would
+    # drag every unused column through SQLite and into Python
+    cursor.execute("""
+        SELECT id, filename, original_name, upload_date, file_size,
+               file_path, status, client_id, persona, job_role
+        FROM documents
+        WHERE status != 'deleted' OR status IS NULL
+        ORDER BY upload_date DESC
+    """)
+
+    # Iterate the cursor directly so peak memory is one row, not N;
+    # orjson then serializes the result in C instead of stdlib json
+    documents = [
+        {
+            "id": doc_id or 'unknown',
+            "filename": filename or 'unknown.pdf',
+            "original_name": original_name or filename or 'Unknown Document',
+            "upload_date": upload_date or datetime.now().isoformat(),
+            "file_size": file_size or 0,
+            "file_path": file_path or '',
+            "status": status or 'uploaded',
+            "client_id": client_id,
+            "persona": persona,
+            "job_role": job_role,
+            "url": "/api/files/" + (filename or 'unknown.pdf')
+        }
+        for (doc_id, filename, original_name, upload_date, file_size,
+             file_path, status, client_id, persona, job_role) in cursor
+    ]
+
+    return {
+        "documents": documents,
+        "count": len(documents),
+        "database_path": str(db_path),
+        "success": True
+    }
+
+@app.get("/emergency/documents", response_class=ORJSONResponse)
 async def emergency_get_documents():
     """Emergency endpoint to get all documents"""
     try:
@@ -57,65 +199,13 @@ async def emergency_get_documents():
             }
         
         print(f"📚 Emergency API: Using database at {db_path}")
-        
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Check if table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='documents'")
-        if not cursor.fetchone():
-            conn.close()
-            return {
-                "documents": [],
-                "count": 0,
-                "error": "Documents table not found",
-                "database_path": str(db_path)
-            }
-        
-        # Get all documents
-        cursor.execute("""
-            SELECT * FROM documents 
-            WHERE status != 'deleted' OR status IS NULL
-            ORDER BY upload_date DESC
-        """)
-        
-        rows = cursor.fetchall()
-        documents = []
-        
-        for row in rows:
-            doc = dict(row)
-            
-            # Ensure required fields exist
-            doc_data = {
-                "id": doc.get('id', 'unknown'),
-                "filename": doc.get('filename', 'unknown.pdf'),
-                "original_name": doc.get('original_name', doc.get('filename', 'Unknown Document')),
-                "upload_date": doc.get('upload_date', datetime.now().isoformat()),
-                "file_size": doc.get('file_size', 0),
-                "file_path": doc.get('file_path', ''),
-                "status": doc.get('status', 'uploaded'),
-                "client_id": doc.get('client_id'),
-                "persona": doc.get('persona'),
-                "job_role": doc.get('job_role'),
-                "url": f"/api/files/{doc.get('filename', 'unknown.pdf')}"
-            }
-            
-            documents.append(doc_data)
-        
-        conn.close()
-        
-        return {
-            "documents": documents,
-            "count": len(documents),
-            "database_path": str(db_path),
-            "success": True
-        }
-        
+
+        # sqlite3 blocks, so run the query off the event loop; the
+        # shared connection is check_same_thread=False for exactly this
+        return await asyncio.to_thread(_fetch_documents_sync, db_path)
+
     except Exception as e:
-        print(f"❌ Emergency API error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Emergency API error: %s", e)
         
         return {
             "documents": [],
@@ -128,20 +218,10 @@ async def emergency_get_documents():
 async def emergency_status():
     """Check system status"""
     db_path = find_database()
-    
-    # Check for PDF files
-    pdf_dirs = [
-        "backend/data/docs",
-        "data/docs",
-        "backend/app/data/docs"
-    ]
-    
-    pdf_files = []
-    for pdf_dir in pdf_dirs:
-        if Path(pdf_dir).exists():
-            pdfs = list(Path(pdf_dir).glob("*.pdf"))
-            pdf_files.extend(pdfs)
-    
+
+    # Check for PDF files (cached on the same TTL as find_database)
+    pdf_dirs, pdf_files = _find_pdf_files_cached(int(time.time()) // 30)
+
     return {
         "database_found": db_path is not None,
         "database_path": str(db_path) if db_path else None,
@@ -154,4 +234,9 @@ if __name__ == "__main__":
     import uvicorn
     print("🚨 Starting Emergency Document API on port 8081")
     print("🔗 Access at: http://localhost:8081/emergency/documents")
-    uvicorn.run(app, host="0.0.0.0", port=8081)
+    # Multiple workers use all cores for row packing + JSON encoding;
+    # each worker lazily opens its own SQLite connection, so nothing is
+    # shared across the forked processes. uvicorn picks uvloop/httptools
+    # automatically when installed (uvicorn[standard]).
+    uvicorn.run("emergency_api:app", host="0.0.0.0", port=8081,
+                workers=min(4, (os.cpu_count() or 1) * 2 + 1))
@@ -5,33 +5,38 @@ Restart server script to ensure fresh imports
 
 import sys
 import os
+import shutil
 import subprocess
+from pathlib import Path
 
 def restart_server():
     """Restart the server with fresh imports"""
     print("🔄 Restarting server with fresh imports...")
-    
+
     # Change to backend directory
     backend_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(backend_dir)
-    
-    # Clear Python cache
+
+    # Clear Python cache — only app/ holds the imports we care about,
+    # so don't let the walker descend into node_modules, venvs or
+    # data/ (the old full-tree walk was a stat storm for no benefit)
     print("🧹 Clearing Python cache...")
-    for root, dirs, files in os.walk('.'):
-        for d in dirs:
-            if d == '__pycache__':
-                cache_dir = os.path.join(root, d)
-                try:
-                    import shutil
-                    shutil.rmtree(cache_dir)
-                    print(f"  Removed: {cache_dir}")
-                except Exception as e:
-                    print(f"  Failed to remove {cache_dir}: {e}")
-    
-    # Start server
+    removed = 0
+    for cache_dir in Path('app').rglob('__pycache__'):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        removed += 1
+    print(f"  Removed {removed} cache directories")
+
+    # Start server with auto-reload watching only the app sources, so
+    # code edits restart workers without re-running this script (and
+    # without the watcher chasing .pyc churn)
     print("🚀 Starting server...")
-    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8080"]
-    subprocess.run(cmd)
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app",
+           "--host", "0.0.0.0", "--port", "8080",
+           "--reload", "--reload-dir", "app", "--reload-exclude", "*.pyc"]
+    # No bytecode from the spawned server means the next restart has
+    # nothing to clean; imports stay fresh by construction
+    subprocess.run(cmd, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
 
 if __name__ == "__main__":
     restart_server()
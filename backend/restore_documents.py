@@ -10,7 +10,13 @@ def restore_documents():
     conn = sqlite3.connect('data/documents.db')
     cursor = conn.cursor()
 
+    # WAL + NORMAL sync: the restore commits with one fsync and never
+    # blocks a reader mid-update
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+
     # Update all deleted documents back to uploaded status
+    cursor.execute("BEGIN IMMEDIATE")
     cursor.execute('UPDATE documents SET status = "uploaded" WHERE status = "deleted"')
     affected = cursor.rowcount
     conn.commit()
@@ -4,12 +4,19 @@ Test duplicate prevention system
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import tempfile
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 BASE_URL = "http://localhost:8080"
 
+# One session for every request: the underlying TCP connection is kept
+# alive and reused, so each upload skips a fresh handshake
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0))
+
 def create_test_pdf(content: str = "Test PDF Content") -> bytes:
     """Create a simple test PDF"""
     pdf_content = f"""%PDF-1.4
@@ -81,7 +88,7 @@ def test_duplicate_prevention():
         files = {'file': ('test_document.pdf', pdf_content, 'application/pdf')}
         data = {'persona': 'Test User', 'job': 'Testing'}
 
-        response = requests.post(f"{BASE_URL}/upload/active_file?client_id=test-client", files=files, data=data)
+        response = SESSION.post(f"{BASE_URL}/upload/active_file?client_id=test-client", files=files, data=data)
         print(f"Status: {response.status_code}")
         
         if response.status_code in [200, 202]:
@@ -104,7 +111,7 @@ def test_duplicate_prevention():
         files = {'file': ('test_document_copy.pdf', pdf_content, 'application/pdf')}
         data = {'persona': 'Test User', 'job': 'Testing'}
 
-        response = requests.post(f"{BASE_URL}/upload/active_file?client_id=test-client", files=files, data=data)
+        response = SESSION.post(f"{BASE_URL}/upload/active_file?client_id=test-client", files=files, data=data)
         print(f"Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -135,7 +142,7 @@ def test_duplicate_prevention():
         files = {'file': ('different_document.pdf', different_pdf, 'application/pdf')}
         data = {'persona': 'Test User', 'job': 'Testing'}
 
-        response = requests.post(f"{BASE_URL}/upload/active_file?client_id=test-client", files=files, data=data)
+        response = SESSION.post(f"{BASE_URL}/upload/active_file?client_id=test-client", files=files, data=data)
         print(f"Status: {response.status_code}")
         
         if response.status_code in [200, 202]:
@@ -176,7 +183,7 @@ def test_bulk_duplicate_prevention():
         ]
         data = {'persona': 'Test User', 'job': 'Testing'}
 
-        response = requests.post(f"{BASE_URL}/upload/context_files?client_id=test-client", files=files, data=data)
+        response = SESSION.post(f"{BASE_URL}/upload/context_files?client_id=test-client", files=files, data=data)
         print(f"Status: {response.status_code}")
         
         if response.status_code in [200, 202]:
@@ -200,6 +207,48 @@ def test_bulk_duplicate_prevention():
         print(f"❌ Bulk upload error: {e}")
         return False
 
+def test_concurrent_duplicate_prevention():
+    """Test duplicate prevention under concurrent single-file uploads"""
+    print("\n🧪 Testing Concurrent Upload Duplicate Prevention")
+    print("=" * 50)
+
+    # Same content from several clients at once — the server must still
+    # resolve them to one document
+    pdf_content = create_test_pdf("Concurrent Test Document")
+
+    def upload(name: str):
+        files = {'file': (name, pdf_content, 'application/pdf')}
+        data = {'persona': 'Test User', 'job': 'Testing'}
+        return SESSION.post(f"{BASE_URL}/upload/active_file?client_id=test-client",
+                            files=files, data=data)
+
+    try:
+        # The uploads are independent and I/O-bound, so fire them in
+        # parallel off the shared session's connection pool
+        names = [f'concurrent_doc_{i}.pdf' for i in range(4)]
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            responses = list(pool.map(upload, names))
+
+        job_ids = set()
+        for response in responses:
+            print(f"Status: {response.status_code}")
+            if response.status_code not in [200, 202]:
+                print(f"❌ Concurrent upload failed: {response.text}")
+                return False
+            job_ids.add(response.json().get('job_id'))
+
+        print(f"   Unique Job IDs: {len(job_ids)}")
+        if len(job_ids) == 1:
+            print("🎉 Concurrent duplicates collapsed to one document!")
+            return True
+        else:
+            print("❌ Concurrent uploads created multiple documents")
+            return False
+
+    except Exception as e:
+        print(f"❌ Concurrent upload error: {e}")
+        return False
+
 if __name__ == "__main__":
     print("🚀 Starting Duplicate Prevention Tests...")
     
@@ -208,12 +257,16 @@ if __name__ == "__main__":
     
     # Test bulk upload duplicate prevention
     bulk_test_passed = test_bulk_duplicate_prevention()
-    
+
+    # Test duplicate prevention under concurrent uploads
+    concurrent_test_passed = test_concurrent_duplicate_prevention()
+
     print(f"\n📊 Test Results:")
     print(f"   Single Upload Duplicate Prevention: {'✅ PASSED' if single_test_passed else '❌ FAILED'}")
     print(f"   Bulk Upload Duplicate Prevention: {'✅ PASSED' if bulk_test_passed else '❌ FAILED'}")
-    
-    if single_test_passed and bulk_test_passed:
+    print(f"   Concurrent Upload Duplicate Prevention: {'✅ PASSED' if concurrent_test_passed else '❌ FAILED'}")
+
+    if single_test_passed and bulk_test_passed and concurrent_test_passed:
         print(f"\n🎉 All duplicate prevention tests PASSED!")
     else:
         print(f"\n❌ Some duplicate prevention tests FAILED!")